@@ -0,0 +1,69 @@
+import re
+import time
+import sqlite3
+import threading
+
+MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+def _expires_at(cache_control):
+    """
+    Returns the timestamp until which a response with the given
+    Cache-Control header value is fresh (0 if it has no max-age).
+    """
+    match = MAX_AGE_RE.search(cache_control or '')
+    return time.time() + int(match.group(1)) if match else 0
+
+
+class ResponseCache:
+    """
+    Stores GitHub API response bodies on disk in sqlite, keyed by URL and by
+    the credentials used to fetch them, so a response seen with one token is
+    never served to another token or to unauthenticated runs.
+    Each entry keeps the ETag for conditional requests and the time until
+    which the response is fresh according to its Cache-Control header.
+    """
+    def __init__(self, path='gh_cache.sqlite'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS auth_responses '
+                '(auth TEXT, url TEXT, etag TEXT, expires REAL, body BLOB, PRIMARY KEY (auth, url))'
+            )
+
+    def get(self, auth, url):
+        """
+        Looks up a cached response.
+        Returns a tuple (etag, fresh, body) or None if the URL is not cached.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT etag, expires, body FROM auth_responses WHERE auth = ? AND url = ?', (auth, url)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, expires, body = row
+        return etag, expires > time.time(), body
+
+    def set(self, auth, url, etag, cache_control, body):
+        """
+        Stores a response body with its ETag and Cache-Control header value.
+        """
+        expires = _expires_at(cache_control)
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO auth_responses (auth, url, etag, expires, body) VALUES (?, ?, ?, ?, ?)',
+                (auth, url, etag, expires, body)
+            )
+
+    def touch(self, auth, url, cache_control):
+        """
+        Extends the freshness of a cached response after a 304 Not Modified.
+        """
+        expires = _expires_at(cache_control)
+        with self._lock, self._conn:
+            self._conn.execute(
+                'UPDATE auth_responses SET expires = ? WHERE auth = ? AND url = ?', (expires, auth, url)
+            )
@@ -1,18 +1,121 @@
 import os
+import hashlib
+import math
+import time
+import itertools
+import threading
+import asyncio
+import orjson
+import httpx
 import requests
+from functools import partial
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
+from analyzer.cache import ResponseCache
+from analyzer.ratelimit import RateLimiter
+
+# Public owned repos of a user or organization and (optionally) their language breakdowns (100 repos per page)
+REPOS_BUNDLE_QUERY = '''
+query($login: String!, $cursor: String, $languages: Boolean!) {
+  repositoryOwner(login: $login) {
+    repositories(first: 100, after: $cursor, ownerAffiliations: OWNER, privacy: PUBLIC) {
+      pageInfo { endCursor hasNextPage }
+      nodes {
+        name stargazerCount forkCount description url
+        primaryLanguage { name }
+        languages(first: 20, orderBy: {field: SIZE, direction: DESC}) @include(if: $languages) {
+          edges { size node { name } }
+        }
+      }
+    }
+  }
+}
+'''
+
+# The only repo list fields the analyzer reads; the rest (~50 per repo) are dropped right after parsing
+REPO_FIELDS = ('name', 'stargazers_count', 'forks_count', 'language', 'description', 'html_url')
+
+# In-process LRU of languages dicts keyed by (auth key, URL), shared by every fetcher; the
+# auth key covers the whole rotating token set so auth-dependent results never leak across fetchers
+LANGUAGES_MEMO_SIZE = 4096
+_languages_memo = OrderedDict()
+_languages_memo_lock = threading.Lock()
+
+
+def _memo_get(key):
+    """
+    Returns the memoized languages dict for a key, or None on a miss.
+    """
+    with _languages_memo_lock:
+        if key not in _languages_memo:
+            return None
+        _languages_memo.move_to_end(key)
+        return _languages_memo[key]
+
+
+def _memo_set(key, langs):
+    """
+    Memoizes a languages dict, evicting the least recently used entry when full.
+    """
+    with _languages_memo_lock:
+        _languages_memo[key] = langs
+        _languages_memo.move_to_end(key)
+        if len(_languages_memo) > LANGUAGES_MEMO_SIZE:
+            _languages_memo.popitem(last=False)
+
+
+def _slim_repos(pages):
+    """
+    Flattens repository list pages, keeping only REPO_FIELDS of each repo.
+    """
+    return [{field: repo.get(field) for field in REPO_FIELDS} for page in pages for repo in page]
+
+
+def _in_event_loop():
+    """
+    Returns True when called from inside a running asyncio event loop
+    (e.g. Jupyter or an async application), where asyncio.run cannot be used.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
 
 class GitHubFetcher:
     """
     Handles fetching user and repository data from the GitHub API.
-    Uses a personal access token if provided for higher rate limits.
+    Uses personal access tokens if provided for higher rate limits; several
+    tokens (GITHUB_TOKENS, comma-separated) are used round-robin.
     """
-    def __init__(self, token=None):
+    def __init__(self, token=None, cache_path='gh_cache.sqlite'):
         load_dotenv()
-        self.token = token or os.getenv('GITHUB_TOKEN')
+        if token:
+            self._tokens = [token]
+        else:
+            self._tokens = [t.strip() for t in os.getenv('GITHUB_TOKENS', '').split(',') if t.strip()]
+            if not self._tokens and os.getenv('GITHUB_TOKEN'):
+                self._tokens = [os.getenv('GITHUB_TOKEN')]
+        self.token = self._tokens[0] if self._tokens else None
+        # Identifies this fetcher's credentials (the whole rotating token set) in cache keys
+        self._auth_key = hashlib.sha256(','.join(sorted(self._tokens)).encode()).hexdigest() if self._tokens else ''
         # print('Loaded token:', self.token)  # Debug print (remove/comment for production)
+        self._tok_iter = itertools.cycle(self._tokens)
+        # (token, rate limit resource) -> RateLimiter tracking that budget (token None for unauthenticated requests)
+        self._limiters = {}
         self.base_url = 'https://api.github.com'
-        self.headers = {'Authorization': f'token {self.token}'} if self.token else {}
+        # Reuse one keep-alive connection pool for all synchronous requests
+        self.session = requests.Session()
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504])
+        self.session.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry))
+        # On-disk ETag cache shared by the sync and async request paths (None disables it)
+        self.cache = ResponseCache(cache_path) if cache_path else None
+        # Upper bound on in-flight requests for the concurrent fetch helpers
+        self.max_concurrency = 16
 
     def get_user_profile(self, username):
         """
@@ -20,34 +123,294 @@ class GitHubFetcher:
         Returns a dict with user details.
         """
         url = f'{self.base_url}/users/{username}'
-        resp = requests.get(url, headers=self.headers)
-        resp.raise_for_status()
-        return resp.json()
+        return self._get(url)
 
-    def get_user_repos(self, username):
+    def get_user_repos(self, username, public_repos=None):
         """
-        Fetches all public repositories for a given GitHub username.
+        Fetches all public repositories for a given GitHub username, trimmed
+        to REPO_FIELDS. The page count is derived from the profile's public_repos (fetched if
+        not given) so that every page can be requested concurrently.
         Returns a list of repository dicts.
         """
+        if public_repos is None:
+            public_repos = self.get_user_profile(username).get('public_repos', 0)
+        num_pages = max(1, math.ceil(public_repos / 100))
+        if _in_event_loop():
+            # requests releases the GIL on socket I/O, so threads fan out nearly as well
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                pages = list(executor.map(self._get, self._repos_page_urls(username, num_pages)))
+            return _slim_repos(pages)
+        return asyncio.run(self.get_user_repos_pages(username, num_pages))
+
+    async def get_user_repos_pages(self, username, num_pages):
+        """
+        Fetches the given number of repository list pages concurrently.
+        Returns the repositories of all pages concatenated in page order,
+        trimmed to REPO_FIELDS.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._async_client() as client:
+            tasks = [self._get_json(client, semaphore, url) for url in self._repos_page_urls(username, num_pages)]
+            pages = await asyncio.gather(*tasks)
+        return _slim_repos(pages)
+
+    def _repos_page_urls(self, username, num_pages):
+        """
+        Returns the URLs of the first num_pages repository list pages.
+        """
+        url = f'{self.base_url}/users/{username}/repos?per_page=100'
+        return [f'{url}&page={page}' for page in range(1, num_pages + 1)]
+
+    def get_repo_languages(self, username, repo_name):
+        """
+        Fetches the language breakdown for a specific repository.
+        Returns a dict mapping language names to bytes of code.
+        """
+        url = self._languages_url(username, repo_name)
+        langs = _memo_get((self._auth_key, url))
+        if langs is None:
+            langs = self._get(url)
+            _memo_set((self._auth_key, url), langs)
+        return langs
+
+    def _languages_url(self, username, repo_name):
+        """
+        Returns the /languages endpoint URL for a repository.
+        """
+        return f'{self.base_url}/repos/{username}/{repo_name}/languages'
+
+    def get_profile_bundle(self, username, languages=True):
+        """
+        Fetches the REST profile, then all public repositories and, if
+        languages is True, their language breakdowns through the GraphQL API
+        (one request per 100 repos). Works for users and organizations.
+        Requires a token. Returns a tuple (profile, repos) shaped like the
+        REST responses; with languages, each repo dict also carries a
+        'languages' dict.
+        """
+        profile = self.get_user_profile(username)
+        if profile.get('public_repos', 0) == 0:
+            return profile, []
+        url = f'{self.base_url}/graphql'
         repos = []
-        page = 1
+        cursor = None
         while True:
-            url = f'{self.base_url}/users/{username}/repos?per_page=100&page={page}'
-            resp = requests.get(url, headers=self.headers)
+            payload = {'query': REPOS_BUNDLE_QUERY, 'variables': {'login': username, 'cursor': cursor, 'languages': languages}}
+            resp = self._request('POST', url, data=orjson.dumps(payload),
+                                 headers={'Content-Type': 'application/json'}, resource='graphql')
             resp.raise_for_status()
-            data = resp.json()
-            if not data:
+            data = orjson.loads(resp.content)
+            if data.get('errors'):
+                raise RuntimeError(f"GraphQL error: {data['errors'][0]['message']}")
+            page = data['data']['repositoryOwner']['repositories']
+            for node in page['nodes']:
+                repo = {
+                    'name': node['name'],
+                    'stargazers_count': node['stargazerCount'],
+                    'forks_count': node['forkCount'],
+                    'language': (node['primaryLanguage'] or {}).get('name'),
+                    'description': node['description'],
+                    'html_url': node['url']
+                }
+                if 'languages' in node:
+                    repo['languages'] = {edge['node']['name']: edge['size'] for edge in node['languages']['edges']}
+                repos.append(repo)
+            if not page['pageInfo']['hasNextPage']:
                 break
-            repos.extend(data)
-            page += 1
-        return repos
+            cursor = page['pageInfo']['endCursor']
+        return profile, repos
 
-    def get_repo_languages(self, username, repo_name):
+    async def get_repo_languages_bulk(self, username, repo_names):
         """
-        Fetches the language breakdown for a specific repository.
-        Returns a dict mapping language names to bytes of code.
+        Fetches the language breakdown for many repositories concurrently.
+        Returns a dict mapping each repo name to its languages dict, or to the
+        exception raised while fetching it.
         """
-        url = f'{self.base_url}/repos/{username}/{repo_name}/languages'
-        resp = requests.get(url, headers=self.headers)
+        urls = {name: self._languages_url(username, name) for name in repo_names}
+        results = {name: _memo_get((self._auth_key, url)) for name, url in urls.items()}
+        pending = [name for name, langs in results.items() if langs is None]
+        if pending:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            async with self._async_client() as client:
+                tasks = [self._get_json(client, semaphore, urls[name]) for name in pending]
+                fetched = await asyncio.gather(*tasks, return_exceptions=True)
+            for repo_name, langs in zip(pending, fetched):
+                if not isinstance(langs, Exception):
+                    _memo_set((self._auth_key, urls[repo_name]), langs)
+                results[repo_name] = langs
+        return results
+
+    def fetch_all_languages(self, username, repos):
+        """
+        Synchronous wrapper around get_repo_languages_bulk for a list of repo dicts.
+        Falls back to a thread pool when already inside an event loop.
+        Returns a dict keyed by repo name, like get_repo_languages_bulk.
+        """
+        repo_names = [repo['name'] for repo in repos]
+        if _in_event_loop():
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                results = list(executor.map(partial(self._get_repo_languages_or_error, username), repo_names))
+            return dict(zip(repo_names, results))
+        return asyncio.run(self.get_repo_languages_bulk(username, repo_names))
+
+    def _get_repo_languages_or_error(self, username, repo_name):
+        """
+        Calls get_repo_languages, returning any exception instead of raising it
+        so the threaded fallback matches asyncio.gather(return_exceptions=True).
+        """
+        try:
+            return self.get_repo_languages(username, repo_name)
+        except Exception as e:
+            return e
+
+    def _async_client(self):
+        """
+        Creates an HTTP/2 client for the concurrent fetch helpers, so the
+        fan-out is multiplexed over a single TLS connection to the API.
+        Auth headers are set per request by _get_json.
+        """
+        return httpx.AsyncClient(http2=True, limits=httpx.Limits(max_connections=32))
+
+    def _limiter(self, token, resource='core'):
+        """
+        Returns the RateLimiter tracking the given token's budget for a rate
+        limit resource ('core' for REST, 'graphql' for GraphQL), which GitHub
+        counts separately.
+        """
+        key = (token, resource)
+        if key not in self._limiters:
+            self._limiters[key] = RateLimiter()
+        return self._limiters[key]
+
+    def _next_token(self, resource='core'):
+        """
+        Picks the next token in round-robin order, preferring tokens with
+        budget above their reserve, then any token that is not exhausted.
+        Returns None when no token is configured.
+        """
+        if not self._tokens:
+            return None
+        start = self._tokens.index(next(self._tok_iter))
+        candidates = self._tokens[start:] + self._tokens[:start]
+        for token in candidates:
+            if not self._limiter(token, resource).in_reserve():
+                return token
+        for token in candidates:
+            if not self._limiter(token, resource).exhausted():
+                return token
+        # Every token is exhausted; use the one that resets first
+        return min(self._tokens, key=lambda t: self._limiter(t, resource).reset)
+
+    def _auth_headers(self, token):
+        """
+        Returns the Authorization header for a token (empty without one).
+        """
+        return {'Authorization': f'token {token}'} if token else {}
+
+    def _retry_delay(self, limiter, attempt, status, headers, resource):
+        """
+        Returns how long to wait before retrying a response, 0 to retry at
+        once on another token, or None if it should not be retried.
+        """
+        if status in (403, 429) and limiter.exhausted() and any(
+                not self._limiter(t, resource).exhausted() for t in self._tokens):
+            return 0
+        return limiter.backoff(attempt, status, headers)
+
+    def _request(self, method, url, headers=None, resource='core', **kwargs):
+        """
+        Sends a request with the pooled session, paced by the chosen token's
+        RateLimiter and retried while the response is rate-limited.
+        Returns the final response.
+        """
+        attempt = 0
+        while True:
+            token = self._next_token(resource)
+            limiter = self._limiter(token, resource)
+            time.sleep(limiter.delay())
+            resp = self.session.request(method, url, headers={**(headers or {}), **self._auth_headers(token)}, **kwargs)
+            limiter.update(resp.headers)
+            delay = self._retry_delay(limiter, attempt, resp.status_code, resp.headers, resource)
+            if delay is None:
+                return resp
+            if delay:
+                # Switching to another token does not count as a backoff attempt
+                attempt += 1
+                time.sleep(delay)
+
+    async def _request_async(self, client, semaphore, url, headers=None):
+        """
+        Async counterpart of _request for REST GETs on an httpx client; the
+        semaphore is only held while a request is in flight.
+        Returns a tuple (status, headers, body); raises for error statuses.
+        """
+        attempt = 0
+        while True:
+            token = self._next_token()
+            limiter = self._limiter(token)
+            await asyncio.sleep(limiter.delay())
+            async with semaphore:
+                resp = await client.get(url, headers={**(headers or {}), **self._auth_headers(token)})
+            limiter.update(resp.headers)
+            delay = self._retry_delay(limiter, attempt, resp.status_code, resp.headers, 'core')
+            if delay is None:
+                # httpx raises for every non-2xx status, including 304 Not Modified
+                if resp.status_code != 304:
+                    resp.raise_for_status()
+                return resp.status_code, resp.headers, resp.content
+            if delay:
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    def _cached(self, url):
+        """
+        Looks up a URL in the response cache entries of this fetcher's tokens.
+        Returns a tuple (cached entry or None, extra request headers).
+        """
+        cached = self.cache.get(self._auth_key, url) if self.cache else None
+        headers = {'If-None-Match': cached[0]} if cached and cached[0] else {}
+        return cached, headers
+
+    def _store(self, url, status, headers, body):
+        """
+        Records a response in the cache: refreshes the entry on 304 Not
+        Modified, or stores the new body when the response carries an ETag.
+        """
+        if not self.cache:
+            return
+        if status == 304:
+            self.cache.touch(self._auth_key, url, headers.get('Cache-Control'))
+        elif headers.get('ETag'):
+            self.cache.set(self._auth_key, url, headers['ETag'], headers.get('Cache-Control'), body)
+
+    def _get(self, url):
+        """
+        GETs a URL with the pooled session, serving fresh cache hits directly
+        and revalidating stale ones with If-None-Match.
+        Returns the decoded JSON body.
+        """
+        cached, headers = self._cached(url)
+        if cached and cached[1]:
+            return orjson.loads(cached[2])
+        resp = self._request('GET', url, headers=headers)
+        if resp.status_code == 304 and cached:
+            self._store(url, 304, resp.headers, None)
+            return orjson.loads(cached[2])
         resp.raise_for_status()
-        return resp.json()
\ No newline at end of file
+        self._store(url, resp.status_code, resp.headers, resp.content)
+        return orjson.loads(resp.content)
+
+    async def _get_json(self, client, semaphore, url):
+        """
+        GETs a URL on the given httpx client, bounded by the semaphore,
+        using the same cache rules as _get.
+        Returns the decoded JSON body.
+        """
+        cached, headers = self._cached(url)
+        if cached and cached[1]:
+            return orjson.loads(cached[2])
+        status, resp_headers, body = await self._request_async(client, semaphore, url, headers)
+        self._store(url, status, resp_headers, body)
+        if status == 304 and cached:
+            return orjson.loads(cached[2])
+        return orjson.loads(body)
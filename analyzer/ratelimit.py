@@ -0,0 +1,106 @@
+import math
+import time
+import random
+import threading
+
+
+class RateLimiter:
+    """
+    Paces requests for one token using GitHub's rate-limit response headers.
+    Works as a token bucket holding X-RateLimit-Remaining: requests burst
+    freely until only a reserve (reserve_ratio of X-RateLimit-Limit) is left,
+    and only those last requests are spread evenly until X-RateLimit-Reset.
+    Pacing that would wait longer than max_wait is skipped so a run never
+    stalls for the rest of the window. Rate-limited responses (429, or 403
+    with an exhausted budget or a Retry-After header) are retried with
+    exponential backoff and jitter, under the same max_wait limit.
+    """
+    def __init__(self, max_retries=3, base_delay=1.0, max_wait=60.0, reserve_ratio=0.1):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_wait = max_wait
+        self.reserve_ratio = reserve_ratio
+        self.low_water = 0
+        self.remaining = None
+        self.reset = 0
+        self._tokens = None
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    def update(self, headers):
+        """
+        Refills the bucket from the budget reported by a response.
+        """
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        if remaining is None or reset is None:
+            return
+        with self._lock:
+            remaining, reset = int(remaining), int(reset)
+            limit = headers.get('X-RateLimit-Limit')
+            if limit is not None:
+                self.low_water = math.ceil(int(limit) * self.reserve_ratio)
+            if self._tokens is None or reset != self.reset:
+                self._tokens = remaining
+            else:
+                # Requests already reserved but not yet answered are not in the header yet
+                self._tokens = min(self._tokens, remaining)
+            self.remaining, self.reset = remaining, reset
+
+    def exhausted(self):
+        """
+        Returns True if the budget is used up and has not been reset yet.
+        """
+        return self.remaining == 0 and self.reset > time.time()
+
+    def in_reserve(self):
+        """
+        Returns True if only the paced reserve (or nothing) is left in the
+        bucket and the rate-limit window has not been reset yet.
+        """
+        return self._tokens is not None and self._tokens <= self.low_water and self.reset > time.time()
+
+    def delay(self):
+        """
+        Takes a token for the next request.
+        Returns the number of seconds to wait before sending the request.
+        """
+        with self._lock:
+            now = time.time()
+            if self._tokens is not None and self.reset <= now:
+                # The window has been reset; the bucket is full again until the next response says otherwise
+                self._tokens = None
+            if self._tokens is None or self._tokens > self.low_water:
+                if self._tokens is not None:
+                    self._tokens -= 1
+                return 0.0
+            start = max(now, self._next_at)
+            interval = max(0.0, self.reset - start) / max(self._tokens, 1)
+            self._tokens = max(self._tokens - 1, 0)
+            if interval > self.max_wait or start - now > self.max_wait:
+                # Too slow to be worth pacing; let a 403 surface instead
+                return 0.0
+            self._next_at = start + interval
+            return start - now
+
+    def backoff(self, attempt, status, headers):
+        """
+        Decides whether a response should be retried.
+        Returns the number of seconds to wait before retry number attempt + 1,
+        or None if the response is not rate-limited or should not be retried.
+        """
+        retry_after = headers.get('Retry-After')
+        if status not in (403, 429) or attempt >= self.max_retries:
+            return None
+        if retry_after is not None:
+            delay = float(retry_after)
+        elif self.exhausted():
+            delay = self.reset - time.time()
+        elif status == 429:
+            delay = self.base_delay * 2 ** attempt
+        else:
+            # A plain 403 (e.g. a forbidden resource) is not a rate limit
+            return None
+        if delay > self.max_wait:
+            return None
+        return delay + random.random()
@@ -1,49 +1,69 @@
 import requests
 print('>>> Running UPDATED GitHub Profile Analyzer!')
+import sys
 import argparse
-import json
 import csv
+import orjson
+import httpx
+from operator import itemgetter
 from collections import Counter
 from analyzer.fetcher import GitHubFetcher
 from colorama import Fore, Style, init
 
-init(autoreset=True)
+# Strip ANSI codes when output is piped so non-tty consumers get plain text
+init(autoreset=True, strip=not sys.stdout.isatty())
 
 
-def summarize_repos(repos, fetcher, username, verbose=False):
+def summarize_repos(repos, fetcher, username, verbose=False, deep=False):
     """
     Summarize repository statistics for a GitHub user.
     Returns total stars, forks, most used language, and a breakdown of languages.
+    By default each repo counts once for its primary language; with deep=True
+    the breakdown is weighted by bytes of code, which costs one extra request
+    per repo when using the REST API.
     """
     total_stars = 0
     total_forks = 0
     language_counter = Counter()
     repo_details = []
+    langs_map = {}
+    if deep:
+        # Repos from the GraphQL bundle already carry their language stats;
+        # fetch the rest concurrently up front
+        langs_map = {repo['name']: repo['languages'] for repo in repos if 'languages' in repo}
+        missing = [repo for repo in repos if 'languages' not in repo]
+        if missing:
+            # Failed fetches come back as exception values; split them off in one pass
+            for name, langs in fetcher.fetch_all_languages(username, missing).items():
+                if isinstance(langs, Exception):
+                    if verbose:
+                        print(f"  [!] Could not fetch languages for {name}: {langs}")
+                else:
+                    langs_map[name] = langs
+    # Bind hot-loop methods to locals to skip repeated attribute lookups
+    lc_update = language_counter.update
+    details_append = repo_details.append
+    langs_get = langs_map.get
     for repo in repos:
-        stars = repo.get('stargazers_count', 0)
-        forks = repo.get('forks_count', 0)
-        lang = repo.get('language') or 'Unknown'
+        rg = repo.get
+        name = repo['name']
+        stars = rg('stargazers_count', 0)
+        forks = rg('forks_count', 0)
+        lang = rg('language') or 'Unknown'
         total_stars += stars
         total_forks += forks
-        # Try to get more accurate language stats
-        try:
-            langs = fetcher.get_repo_languages(username, repo['name'])
-            if langs:
-                for l, v in langs.items():
-                    language_counter[l] += v
-            else:
-                language_counter[lang] += 1
-        except Exception as e:
-            if verbose:
-                print(f"  [!] Could not fetch languages for {repo['name']}: {e}")
+        langs = langs_get(name)
+        if langs:
+            lc_update(langs)
+        else:
             language_counter[lang] += 1
-        repo_details.append({
-            'name': repo['name'],
+        details_append({
+            'name': name,
             'stars': stars,
             'forks': forks,
             'language': lang,
-            'description': repo.get('description', ''),
-            'url': repo.get('html_url', '')
+            'description': rg('description', ''),
+            'url': rg('html_url', '')
         })
     most_used_lang = language_counter.most_common(1)[0][0] if language_counter else 'Unknown'
     return {
@@ -55,44 +75,61 @@ def summarize_repos(repos, fetcher, username, verbose=False):
     }
 
 
+# Per-repo line templates, built once with the color codes baked in and filled with format_map(repo)
+REPO_LINE = f"{Fore.YELLOW}  • {Fore.WHITE}{{name}} {Fore.CYAN}(⭐ {{stars}}, 🍴 {{forks}}, 💻 {{language}})"
+REPO_DESC_LINE = f"     {Fore.LIGHTBLACK_EX}↳ {{description}}"
+REPO_URL_LINE = f"     {Fore.LIGHTBLUE_EX}🔗 {{url}}"
+MD_REPO_LINE = "- **{name}** (⭐ {stars}, Forks: {forks}, Lang: {language})\n"
+MD_REPO_DESC_LINE = "    - Desc: {description}\n"
+MD_REPO_URL_LINE = "    - URL: {url}\n"
+
+
 def print_console(profile, summary, verbose=False):
     """
     Print a visually appealing summary of the GitHub profile and repositories to the console.
     Uses colorama for colored output and shows top 3 languages only.
+    Lines are buffered and written to stdout in a single call.
     """
-    print(f"\n{Fore.CYAN}{Style.BRIGHT}{'='*50}")
-    print(f"{Fore.GREEN}{Style.BRIGHT}GitHub Profile Analysis for {profile.get('login')}")
-    print(f"{Fore.CYAN}{'='*50}{Style.RESET_ALL}")
-    print(f"{Fore.YELLOW}👤 Name:        {Fore.WHITE}{profile.get('name')}")
-    print(f"{Fore.YELLOW}📦 Public repos:{Fore.WHITE} {profile.get('public_repos')}")
-    print(f"{Fore.YELLOW}⭐ Followers:   {Fore.WHITE}{profile.get('followers')}")
-    print(f"{Fore.YELLOW}➡️  Following:   {Fore.WHITE}{profile.get('following')}")
-    print(f"{Fore.YELLOW}📝 Bio:         {Fore.WHITE}{profile.get('bio')}")
-    print(f"\n{Fore.MAGENTA}{'-'*40}")
-    print(f"{Fore.BLUE}{Style.BRIGHT}Summary:{Style.RESET_ALL}")
-    print(f"{Fore.CYAN}⭐ Total stars:      {Fore.WHITE}{summary['total_stars']}")
-    print(f"{Fore.CYAN}🍴 Total forks:      {Fore.WHITE}{summary['total_forks']}")
-    print(f"{Fore.CYAN}💻 Most used lang:   {Fore.WHITE}{summary['most_used_language']}")
+    out = []
+    out.append(f"\n{Fore.CYAN}{Style.BRIGHT}{'='*50}")
+    out.append(f"{Fore.GREEN}{Style.BRIGHT}GitHub Profile Analysis for {profile.get('login')}")
+    out.append(f"{Fore.CYAN}{'='*50}{Style.RESET_ALL}")
+    out.append(f"{Fore.YELLOW}👤 Name:        {Fore.WHITE}{profile.get('name')}")
+    out.append(f"{Fore.YELLOW}📦 Public repos:{Fore.WHITE} {profile.get('public_repos')}")
+    out.append(f"{Fore.YELLOW}⭐ Followers:   {Fore.WHITE}{profile.get('followers')}")
+    out.append(f"{Fore.YELLOW}➡️  Following:   {Fore.WHITE}{profile.get('following')}")
+    out.append(f"{Fore.YELLOW}📝 Bio:         {Fore.WHITE}{profile.get('bio')}")
+    out.append(f"\n{Fore.MAGENTA}{'-'*40}")
+    out.append(f"{Fore.BLUE}{Style.BRIGHT}Summary:{Style.RESET_ALL}")
+    out.append(f"{Fore.CYAN}⭐ Total stars:      {Fore.WHITE}{summary['total_stars']}")
+    out.append(f"{Fore.CYAN}🍴 Total forks:      {Fore.WHITE}{summary['total_forks']}")
+    out.append(f"{Fore.CYAN}💻 Most used lang:   {Fore.WHITE}{summary['most_used_language']}")
     # Simplified language breakdown: show top 3 languages
     lang_counts = summary['language_breakdown']
-    top_langs = sorted(lang_counts.items(), key=lambda x: x[1], reverse=True)[:3]
+    top_langs = Counter(lang_counts).most_common(3)
     lang_str = ', '.join([f"{lang} ({count})" for lang, count in top_langs]) if top_langs else 'N/A'
-    print(f"{Fore.CYAN}🌈 Top languages:     {Fore.WHITE}{lang_str}")
-    print(f"\n{Fore.MAGENTA}{'-'*40}")
-    print(f"{Fore.BLUE}{Style.BRIGHT}Repositories:{Style.RESET_ALL}")
+    out.append(f"{Fore.CYAN}🌈 Top languages:     {Fore.WHITE}{lang_str}")
+    out.append(f"\n{Fore.MAGENTA}{'-'*40}")
+    out.append(f"{Fore.BLUE}{Style.BRIGHT}Repositories:{Style.RESET_ALL}")
     for repo in summary['repo_details']:
-        print(f"{Fore.YELLOW}  • {Fore.WHITE}{repo['name']} {Fore.CYAN}(⭐ {repo['stars']}, 🍴 {repo['forks']}, 💻 {repo['language']})")
+        out.append(REPO_LINE.format_map(repo))
         if repo['description']:
-            print(f"     {Fore.LIGHTBLACK_EX}↳ {repo['description']}")
+            out.append(REPO_DESC_LINE.format_map(repo))
         if verbose:
-            print(f"     {Fore.LIGHTBLUE_EX}🔗 {repo['url']}")
-    print(f"{Fore.CYAN}{'='*50}{Style.RESET_ALL}\n")
+            out.append(REPO_URL_LINE.format_map(repo))
+    out.append(f"{Fore.CYAN}{'='*50}{Style.RESET_ALL}\n")
+    # One write instead of one per line; reset colors at each line end like autoreset did
+    sys.stdout.write((Style.RESET_ALL + '\n').join(out) + '\n')
 
 
 def export_json(profile, summary, filename):
     """Export the analysis to a JSON file."""
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump({'profile': profile, 'summary': summary}, f, indent=2)
+    with open(filename, 'wb') as f:
+        f.write(orjson.dumps({'profile': profile, 'summary': summary}, option=orjson.OPT_INDENT_2))
+
+
+# Column order of the CSV export, matching its header row
+CSV_COLUMNS = itemgetter('name', 'stars', 'forks', 'language', 'description', 'url')
 
 
 def export_csv(summary, filename):
@@ -100,36 +137,37 @@ def export_csv(summary, filename):
     with open(filename, 'w', newline='', encoding='utf-8') as f:
         writer = csv.writer(f)
         writer.writerow(['Repository', 'Stars', 'Forks', 'Language', 'Description', 'URL'])
-        for repo in summary['repo_details']:
-            writer.writerow([
-                repo['name'], repo['stars'], repo['forks'], repo['language'], repo['description'], repo['url']
-            ])
+        writer.writerows(map(CSV_COLUMNS, summary['repo_details']))
 
 
 def export_markdown(profile, summary, filename):
     """Export the analysis to a Markdown file."""
+    parts = [
+        f"# GitHub Profile Analysis for {profile.get('login')}\n\n",
+        f"**Name:** {profile.get('name')}  \n",
+        f"**Public repos:** {profile.get('public_repos')}  \n",
+        f"**Followers:** {profile.get('followers')}  \n",
+        f"**Following:** {profile.get('following')}  \n",
+        f"**Bio:** {profile.get('bio')}\n\n",
+        f"## Summary\n",
+        f"- Total stars: {summary['total_stars']}\n",
+        f"- Total forks: {summary['total_forks']}\n",
+        f"- Most used language: {summary['most_used_language']}\n",
+    ]
+    # Markdown: show top 3 languages
+    lang_counts = summary['language_breakdown']
+    top_langs = Counter(lang_counts).most_common(3)
+    lang_str = ', '.join([f"{lang} ({count})" for lang, count in top_langs]) if top_langs else 'N/A'
+    parts.append(f"- Top languages: {lang_str}\n\n")
+    parts.append(f"## Repositories\n")
+    for repo in summary['repo_details']:
+        parts.append(MD_REPO_LINE.format_map(repo))
+        if repo['description']:
+            parts.append(MD_REPO_DESC_LINE.format_map(repo))
+        parts.append(MD_REPO_URL_LINE.format_map(repo))
+    # Build the document in memory and write it in one call
     with open(filename, 'w', encoding='utf-8') as f:
-        f.write(f"# GitHub Profile Analysis for {profile.get('login')}\n\n")
-        f.write(f"**Name:** {profile.get('name')}  \n")
-        f.write(f"**Public repos:** {profile.get('public_repos')}  \n")
-        f.write(f"**Followers:** {profile.get('followers')}  \n")
-        f.write(f"**Following:** {profile.get('following')}  \n")
-        f.write(f"**Bio:** {profile.get('bio')}\n\n")
-        f.write(f"## Summary\n")
-        f.write(f"- Total stars: {summary['total_stars']}\n")
-        f.write(f"- Total forks: {summary['total_forks']}\n")
-        f.write(f"- Most used language: {summary['most_used_language']}\n")
-        # Markdown: show top 3 languages
-        lang_counts = summary['language_breakdown']
-        top_langs = sorted(lang_counts.items(), key=lambda x: x[1], reverse=True)[:3]
-        lang_str = ', '.join([f"{lang} ({count})" for lang, count in top_langs]) if top_langs else 'N/A'
-        f.write(f"- Top languages: {lang_str}\n\n")
-        f.write(f"## Repositories\n")
-        for repo in summary['repo_details']:
-            f.write(f"- **{repo['name']}** (⭐ {repo['stars']}, Forks: {repo['forks']}, Lang: {repo['language']})\n")
-            if repo['description']:
-                f.write(f"    - Desc: {repo['description']}\n")
-            f.write(f"    - URL: {repo['url']}\n")
+        f.write(''.join(parts))
 
 
 def main():
@@ -142,6 +180,8 @@ def main():
     parser.add_argument('--output', '-o', help='Output file (JSON, CSV, or Markdown based on extension)', default=None)
     parser.add_argument('--format', '-f', help='Output format: console, json, csv, md', default='console')
     parser.add_argument('--verbose', '-v', action='store_true', help='Show more details in output')
+    parser.add_argument('--deep-languages', action='store_true',
+                        help='Weight languages by bytes of code (one extra API request per repo without a token)')
     args = parser.parse_args()
 
     username = args.username
@@ -150,9 +190,18 @@ def main():
 
     fetcher = GitHubFetcher()
     try:
-        profile = fetcher.get_user_profile(username)
-        repos = fetcher.get_user_repos(username)
-        summary = summarize_repos(repos, fetcher, username, verbose=args.verbose)
+        if fetcher.token and args.deep_languages:
+            # GraphQL needs auth and bypasses the ETag cache, but replaces the per-repo
+            # /languages calls with one request per 100 repos
+            profile, repos = fetcher.get_profile_bundle(username)
+        else:
+            profile = fetcher.get_user_profile(username)
+            # get_user_profile raises on unknown users; skip the repo fan-out for empty profiles
+            if profile.get('public_repos', 0) == 0:
+                repos = []
+            else:
+                repos = fetcher.get_user_repos(username, profile['public_repos'])
+        summary = summarize_repos(repos, fetcher, username, verbose=args.verbose, deep=args.deep_languages)
         if args.format == 'console':
             print_console(profile, summary, verbose=args.verbose)
         elif args.format == 'json':
@@ -160,7 +209,10 @@ def main():
                 export_json(profile, summary, args.output)
                 print(f"Exported analysis to {args.output}")
             else:
-                print(json.dumps({'profile': profile, 'summary': summary}, indent=2))
+                # Write UTF-8 bytes directly so non-UTF-8 consoles/redirects (e.g. cp1252) can't fail to encode
+                sys.stdout.flush()
+                sys.stdout.buffer.write(orjson.dumps({'profile': profile, 'summary': summary}, option=orjson.OPT_INDENT_2) + b'\n')
+                sys.stdout.flush()
         elif args.format == 'csv':
             if args.output:
                 export_csv(summary, args.output)
@@ -175,7 +227,7 @@ def main():
                 print("[!] Please specify an output file for Markdown format.")
         else:
             print("[!] Unknown format. Use console, json, csv, or md.")
-    except requests.exceptions.HTTPError as e:
+    except (requests.exceptions.HTTPError, httpx.HTTPStatusError) as e:
         if e.response.status_code == 403:
             print("[!] API rate limit exceeded. Please set a GitHub token in your .env file.")
         else:
@@ -186,6 +238,5 @@ def main():
 if __name__ == '__main__':
     main()
     # Prevent window from closing immediately if run by double-clicking (Windows)
-    import sys
     if sys.stdin.isatty() and sys.stdout.isatty():
         input("Press Enter to exit...")
\ No newline at end of file
@@ -0,0 +1,63 @@
+import pytest
+
+from analyzer.fetcher import GitHubFetcher
+
+URL = 'https://api.github.com/users/octo'
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None, content=b'{}'):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = content
+
+    def raise_for_status(self):
+        assert self.status_code < 400
+
+
+def make_fetcher(monkeypatch, cache_path, token, replies):
+    monkeypatch.delenv('GITHUB_TOKENS', raising=False)
+    monkeypatch.delenv('GITHUB_TOKEN', raising=False)
+    fetcher = GitHubFetcher(token=token, cache_path=str(cache_path))
+    fetcher.sent = []
+
+    def request(method, url, headers=None, **kwargs):
+        fetcher.sent.append(headers)
+        return replies.pop(0)
+
+    fetcher.session.request = request
+    return fetcher
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return tmp_path / 'gh_cache.sqlite'
+
+
+def test_fresh_hit_skips_request(monkeypatch, cache_path):
+    replies = [FakeResponse(200, {'ETag': '"v1"', 'Cache-Control': 'max-age=60'}, b'{"login": "octo"}')]
+    fetcher = make_fetcher(monkeypatch, cache_path, 'a', replies)
+    assert fetcher._get(URL) == {'login': 'octo'}
+    assert fetcher._get(URL) == {'login': 'octo'}
+    assert len(fetcher.sent) == 1
+
+
+def test_stale_hit_revalidates_with_etag(monkeypatch, cache_path):
+    replies = [
+        FakeResponse(200, {'ETag': '"v1"', 'Cache-Control': 'no-cache'}, b'{"login": "octo"}'),
+        FakeResponse(304, {'ETag': '"v1"'}, b''),
+    ]
+    fetcher = make_fetcher(monkeypatch, cache_path, 'a', replies)
+    fetcher._get(URL)
+    assert fetcher._get(URL) == {'login': 'octo'}
+    assert fetcher.sent[1]['If-None-Match'] == '"v1"'
+
+
+def test_token_sets_do_not_share_entries(monkeypatch, cache_path):
+    fresh = {'ETag': '"v1"', 'Cache-Control': 'max-age=60'}
+    first = make_fetcher(monkeypatch, cache_path, 'a', [FakeResponse(200, fresh, b'{"private": true}')])
+    first._get(URL)
+    for token in ('b', None):
+        other = make_fetcher(monkeypatch, cache_path, token, [FakeResponse(200, fresh, b'{"private": false}')])
+        assert other._get(URL) == {'private': False}
+        assert 'If-None-Match' not in other.sent[0]
@@ -0,0 +1,119 @@
+import itertools
+import time
+
+import pytest
+
+from analyzer.fetcher import GitHubFetcher
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None, content=b'{}'):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = content
+
+
+def budget(remaining, limit=5000, reset_in=1800, resource='core'):
+    return {
+        'X-RateLimit-Limit': str(limit),
+        'X-RateLimit-Remaining': str(remaining),
+        'X-RateLimit-Reset': str(int(time.time() + reset_in)),
+        'X-RateLimit-Resource': resource,
+    }
+
+
+@pytest.fixture
+def fetcher(monkeypatch):
+    monkeypatch.delenv('GITHUB_TOKEN', raising=False)
+    monkeypatch.setenv('GITHUB_TOKENS', 'a,b')
+    fetcher = GitHubFetcher(cache_path=None)
+    fetcher.calls = []
+
+    def request(method, url, headers=None, **kwargs):
+        token = headers['Authorization'].split()[1]
+        fetcher.calls.append(token)
+        return fetcher.responses[token]()
+
+    fetcher.session.request = request
+    return fetcher
+
+
+def test_exhausted_token_retries_on_another_token(fetcher):
+    fetcher.responses = {
+        'a': lambda: FakeResponse(403, budget(0)),
+        'b': lambda: FakeResponse(200, budget(4000)),
+    }
+    resp = fetcher._request('GET', 'https://api.github.com/users/octo')
+    assert resp.status_code == 200
+    assert fetcher.calls == ['a', 'b']
+    # a stays skipped until its reset
+    fetcher._request('GET', 'https://api.github.com/users/octo')
+    assert fetcher.calls == ['a', 'b', 'b']
+
+
+def test_all_tokens_exhausted_returns_403(fetcher):
+    fetcher.responses = {
+        'a': lambda: FakeResponse(403, budget(0)),
+        'b': lambda: FakeResponse(403, budget(0)),
+    }
+    resp = fetcher._request('GET', 'https://api.github.com/users/octo')
+    assert resp.status_code == 403
+    assert fetcher.calls == ['a', 'b']
+
+
+def test_tokens_in_reserve_are_avoided(fetcher):
+    fetcher._limiter('a').update(budget(400))
+    fetcher._limiter('b').update(budget(4900))
+    picks = [fetcher._next_token() for _ in range(4)]
+    assert picks == ['b'] * 4
+    assert fetcher._limiter('b').delay() == 0.0
+
+
+def test_graphql_budget_is_tracked_separately(fetcher):
+    fetcher.responses = {
+        'a': lambda: FakeResponse(200, budget(0, resource='graphql')),
+        'b': lambda: FakeResponse(200, budget(0, resource='graphql')),
+    }
+    fetcher._request('POST', 'https://api.github.com/graphql', resource='graphql')
+    assert fetcher._limiter('a', 'graphql').exhausted()
+    assert not fetcher._limiter('a').exhausted()
+
+
+def test_tokens_are_used_round_robin(fetcher):
+    fetcher.responses = {
+        'a': lambda: FakeResponse(200, budget(4000)),
+        'b': lambda: FakeResponse(200, budget(4000)),
+    }
+    for _ in range(4):
+        fetcher._request('GET', 'https://api.github.com/users/octo')
+    assert fetcher.calls == ['a', 'b', 'a', 'b']
+
+
+def test_exhausted_token_is_skipped_until_reset(fetcher):
+    fetcher._limiter('a').update(budget(0, reset_in=1800))
+    assert [fetcher._next_token() for _ in range(3)] == ['b', 'b', 'b']
+    fetcher._limiter('a').update(budget(0, reset_in=-1))
+    assert 'a' in [fetcher._next_token() for _ in range(2)]
+
+
+def test_rate_limited_single_token_backs_off_then_succeeds(monkeypatch, fetcher):
+    sleeps = []
+    monkeypatch.setattr('analyzer.fetcher.time.sleep', sleeps.append)
+    fetcher._tokens = ['a']
+    fetcher._tok_iter = itertools.cycle(fetcher._tokens)
+    replies = iter([FakeResponse(429, {'Retry-After': '0'}), FakeResponse(200, budget(4000))])
+    fetcher.responses = {'a': lambda: next(replies)}
+    resp = fetcher._request('GET', 'https://api.github.com/users/octo')
+    assert resp.status_code == 200
+    assert fetcher.calls == ['a', 'a']
+    assert any(0 < delay < 1 for delay in sleeps)
+
+
+def test_token_env_parsing(monkeypatch):
+    monkeypatch.delenv('GITHUB_TOKEN', raising=False)
+    monkeypatch.setenv('GITHUB_TOKENS', ' a, ,b ')
+    assert GitHubFetcher(cache_path=None)._tokens == ['a', 'b']
+    monkeypatch.delenv('GITHUB_TOKENS')
+    monkeypatch.setenv('GITHUB_TOKEN', 'solo')
+    assert GitHubFetcher(cache_path=None)._tokens == ['solo']
+    assert GitHubFetcher(token='explicit', cache_path=None)._tokens == ['explicit']
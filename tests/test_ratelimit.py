@@ -0,0 +1,56 @@
+import time
+
+import pytest
+
+from analyzer.ratelimit import RateLimiter
+
+
+def budget_headers(remaining, reset_in, limit=60):
+    return {
+        'X-RateLimit-Limit': str(limit),
+        'X-RateLimit-Remaining': str(remaining),
+        'X-RateLimit-Reset': str(int(time.time() + reset_in)),
+    }
+
+
+def test_unauthenticated_budget_bursts_without_waiting():
+    limiter = RateLimiter()
+    limiter.update(budget_headers(59, 3600))
+    assert [limiter.delay() for _ in range(59)] == [0.0] * 59
+
+
+def test_reserve_is_paced_when_reset_is_near():
+    limiter = RateLimiter()
+    limiter.update(budget_headers(59, 30))
+    delays = [limiter.delay() for _ in range(59)]
+    # 10% of the 60-request limit is held back and spread over the remaining window
+    assert delays[:53] == [0.0] * 53
+    reserve = delays[53:]
+    assert reserve[0] == pytest.approx(0.0, abs=0.1)
+    assert all(b > a for a, b in zip(reserve, reserve[1:]))
+    assert reserve[-1] < 30
+
+
+def test_no_pacing_before_first_response():
+    limiter = RateLimiter()
+    assert [limiter.delay() for _ in range(5)] == [0.0] * 5
+
+
+def test_backoff():
+    limiter = RateLimiter()
+    assert limiter.backoff(0, 404, {}) is None
+    assert limiter.backoff(0, 403, {}) is None
+    assert 1.0 <= limiter.backoff(0, 429, {}) < 2.0
+    assert 2.0 <= limiter.backoff(0, 403, {'Retry-After': '2'}) < 3.0
+    assert limiter.backoff(3, 429, {}) is None
+    limiter.update(budget_headers(0, 3600))
+    assert limiter.exhausted()
+    assert limiter.backoff(0, 403, {}) is None
+
+
+def test_bucket_refills_after_reset():
+    limiter = RateLimiter()
+    limiter.update(budget_headers(0, -1))
+    assert not limiter.exhausted()
+    assert not limiter.in_reserve()
+    assert limiter.delay() == 0.0